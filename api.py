@@ -1,12 +1,130 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
 import sqlite3
 from datetime import datetime, timedelta
+import json
+import math
 import os
+import threading
+import time
+
+from collections import OrderedDict
+
+import backup
 
 app = Flask(__name__)
 CORS(app)
 
+# Token-bucket limits per endpoint as (tokens per second, burst size).
+# The dashboard polls /events once a second, so that route gets headroom.
+# Override with e.g. RATE_LIMIT_GET_EVENTS="10,20"; RATE_LIMIT_ENABLED=0 turns it off.
+RATE_LIMITS = {
+    'index': (2.0, 10),
+    'get_events': (5.0, 10),
+    'add_event': (1.0, 5),
+    'delete_event': (1.0, 5),
+    'clear_all': (0.2, 2),
+    'metrics': (5.0, 10),
+    'create_backup': (0.1, 1),
+    'backup_status': (1.0, 5),
+}
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') != '0'
+MAX_BUCKETS = 10000
+
+def parse_rate_limit(name, value):
+    """Parse a "rate,burst" override, naming the variable on bad input"""
+    try:
+        rate, burst = value.split(',')
+        rate, burst = float(rate), int(burst)
+    except ValueError:
+        raise ValueError(f'{name}={value!r}: expected "rate,burst", e.g. "5,10"') from None
+    if rate <= 0 or burst < 1:
+        raise ValueError(f'{name}={value!r}: rate must be > 0 and burst >= 1')
+    return rate, burst
+
+for _endpoint in RATE_LIMITS:
+    _name = f'RATE_LIMIT_{_endpoint.upper()}'
+    if os.environ.get(_name):
+        RATE_LIMITS[_endpoint] = parse_rate_limit(_name, os.environ[_name])
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`; each request costs one."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self, now):
+        """Take a token. Returns 0 on success, else seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+# Least recently used first, so eviction at MAX_BUCKETS is O(1)
+_buckets = OrderedDict()
+_buckets_lock = threading.Lock()
+
+_metrics = {
+    'requests_total': {},
+    'rate_limited_total': {},
+    'events_queries_total': 0,
+    'events_coalesced_total': 0,
+}
+_metrics_lock = threading.Lock()
+
+def _count(name, endpoint=None):
+    with _metrics_lock:
+        if endpoint is None:
+            _metrics[name] += 1
+        else:
+            _metrics[name][endpoint] = _metrics[name].get(endpoint, 0) + 1
+
+@app.before_request
+def rate_limit():
+    endpoint = request.endpoint
+    # CORS preflights would otherwise charge cross-origin clients twice
+    if endpoint not in RATE_LIMITS or request.method == 'OPTIONS':
+        return None
+    _count('requests_total', endpoint)
+    if not RATE_LIMIT_ENABLED:
+        return None
+
+    key = (request.remote_addr, endpoint)
+    now = time.monotonic()
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            if len(_buckets) >= MAX_BUCKETS:
+                _buckets.popitem(last=False)
+            bucket = _buckets[key] = TokenBucket(*RATE_LIMITS[endpoint])
+        else:
+            _buckets.move_to_end(key)
+        wait = bucket.take(now)
+
+    if wait:
+        _count('rate_limited_total', endpoint)
+        response = jsonify({"status": "error", "message": "rate limit exceeded"})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(math.ceil(wait))
+        return response
+    return None
+
+# Concurrent /events requests share one query: the first caller runs it and
+# the rest wait for its serialised body.
+_events_lock = threading.Lock()
+_events_inflight = None
+
+class _InflightQuery:
+    def __init__(self):
+        self.done = threading.Event()
+        self.body = None
+        self.error = None
+
 def ensure_schema(db: sqlite3.Connection) -> None:
     db.execute('''
         CREATE TABLE IF NOT EXISTS events (
@@ -25,6 +143,32 @@ def index():
 
 @app.route('/events')
 def get_events():
+    global _events_inflight
+    with _events_lock:
+        inflight = _events_inflight
+        leader = inflight is None
+        if leader:
+            inflight = _events_inflight = _InflightQuery()
+
+    if leader:
+        try:
+            inflight.body = json.dumps(query_events())
+        except Exception as e:
+            inflight.error = e
+        finally:
+            with _events_lock:
+                _events_inflight = None
+            inflight.done.set()
+        _count('events_queries_total')
+    else:
+        inflight.done.wait()
+        _count('events_coalesced_total')
+
+    if inflight.error is not None:
+        return jsonify({"status": "error", "message": str(inflight.error)}), 500
+    return Response(inflight.body, mimetype='application/json')
+
+def query_events():
     db = sqlite3.connect('events.db')
     ensure_schema(db)
     
@@ -47,7 +191,7 @@ def get_events():
             'date': row[2]
         })
     db.close()
-    return jsonify(events)
+    return events
 
 @app.route('/add-event', methods=['POST'])
 def add_event():
@@ -119,5 +263,41 @@ def clear_all():
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/backup', methods=['POST'])
+def create_backup():
+    try:
+        info = backup.create_snapshot()
+        return jsonify({"status": "ok", "snapshot": info})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/backup')
+def backup_status():
+    return jsonify({"status": "ok", "snapshot": backup.last_snapshot()})
+
+@app.route('/metrics')
+def metrics():
+    with _metrics_lock:
+        snapshot = {
+            'requests_total': dict(_metrics['requests_total']),
+            'rate_limited_total': dict(_metrics['rate_limited_total']),
+            'events_queries_total': _metrics['events_queries_total'],
+            'events_coalesced_total': _metrics['events_coalesced_total'],
+        }
+    with _buckets_lock:
+        snapshot['active_buckets'] = len(_buckets)
+    snapshot['last_backup'] = backup.last_snapshot()
+    snapshot['rate_limit_enabled'] = RATE_LIMIT_ENABLED
+    snapshot['rate_limits'] = {
+        endpoint: {'rate': rate, 'burst': burst}
+        for endpoint, (rate, burst) in RATE_LIMITS.items()
+    }
+    return jsonify(snapshot)
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
+    # Scheduled snapshots, e.g. BACKUP_INTERVAL=3600 for hourly
+    backup_interval = backup.parse_backup_setting(
+        'BACKUP_INTERVAL', os.environ.get('BACKUP_INTERVAL', '0'), float, 0)
+    if backup_interval > 0:
+        backup.start_scheduler(backup_interval)
+    app.run(host='0.0.0.0', port=5000, threaded=True)
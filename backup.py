@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Online snapshots of events.db using SQLite's backup API
+
+Pages are copied in small steps so the API and bot keep reading and
+writing while a snapshot runs.
+
+Usage:
+    python backup.py snapshot
+    python backup.py list
+    python backup.py verify [snapshot]
+    python backup.py restore [snapshot]
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+DB_PATH = 'events.db'
+BACKUP_DIR = os.environ.get('BACKUP_DIR', 'backups')
+
+def parse_backup_setting(name, value, cast, minimum):
+    """Parse a numeric backup setting, naming the variable on bad input"""
+    try:
+        parsed = cast(value)
+    except ValueError:
+        raise ValueError(f'{name}={value!r}: expected a number, e.g. "10"') from None
+    if parsed < minimum:
+        raise ValueError(f'{name}={value!r}: must be at least {minimum}')
+    return parsed
+
+BACKUP_KEEP = parse_backup_setting('BACKUP_KEEP', os.environ.get('BACKUP_KEEP', '10'), int, 1)
+BACKUP_PAGES_PER_STEP = 64
+BACKUP_STEP_SLEEP = 0.005
+
+_snapshot_lock = threading.Lock()
+
+def list_snapshots(backup_dir=BACKUP_DIR):
+    """Return snapshot paths, newest first"""
+    return sorted(Path(backup_dir).glob('events-*.db'), reverse=True)
+
+def last_snapshot(backup_dir=BACKUP_DIR):
+    """Return age in seconds, size and path of the newest snapshot, or None"""
+    for path in list_snapshots(backup_dir):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            # Rotated away by another process since we listed it
+            continue
+        return {
+            'path': str(path),
+            'size': stat.st_size,
+            'age_seconds': time.time() - stat.st_mtime,
+        }
+    return None
+
+def verify_snapshot(path):
+    """Run an integrity check; returns (ok, message)"""
+    try:
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            result = conn.execute('PRAGMA integrity_check').fetchone()[0]
+            conn.execute('SELECT COUNT(*) FROM events').fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        return False, str(e)
+    return result == 'ok', result
+
+def rotate_snapshots(keep=BACKUP_KEEP, backup_dir=BACKUP_DIR):
+    """Delete all but the `keep` newest snapshots"""
+    removed = []
+    for old in list_snapshots(backup_dir)[keep:]:
+        # Another process may have rotated the same file already
+        old.unlink(missing_ok=True)
+        removed.append(str(old))
+    return removed
+
+def create_snapshot(db_path=DB_PATH, backup_dir=BACKUP_DIR, keep=BACKUP_KEEP):
+    """Copy db_path into a new verified snapshot and rotate old ones"""
+    if keep < 1:
+        raise ValueError(f"keep must be at least 1, got {keep}")
+
+    with _snapshot_lock:
+        Path(backup_dir).mkdir(parents=True, exist_ok=True)
+        name = f"events-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.db"
+        final = Path(backup_dir) / name
+        partial = final.with_suffix('.db.partial')
+
+        try:
+            # Read-only so a missing database is an error, not a new empty file
+            src = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+            try:
+                dst = sqlite3.connect(partial)
+                try:
+                    # The source lock is only held per step, so readers and writers
+                    # interleave; a write mid-backup makes SQLite restart the copy.
+                    src.backup(dst, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_STEP_SLEEP)
+                finally:
+                    dst.close()
+            finally:
+                src.close()
+
+            ok, message = verify_snapshot(partial)
+            if not ok:
+                raise RuntimeError(f"snapshot failed integrity check: {message}")
+            os.replace(partial, final)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+
+        rotate_snapshots(keep, backup_dir)
+        return last_snapshot(backup_dir)
+
+def _move_aside(db_path, suffix):
+    """Rename db_path and its journal files to db_path.<suffix>"""
+    target = f"{db_path}.{suffix}"
+    for ext in ('', '-journal', '-wal', '-shm'):
+        if os.path.exists(db_path + ext):
+            os.replace(db_path + ext, target + ext)
+    return target
+
+def restore_snapshot(path=None, db_path=DB_PATH, backup_dir=BACKUP_DIR):
+    """Replace db_path with a snapshot (the newest one by default)
+
+    The database being replaced is kept next to it, as
+    db_path.pre-restore-<ts> if it was readable or db_path.corrupt-<ts> if
+    not. Returns (snapshot path, kept copy or None). Restart the API and
+    bot afterwards so they reopen the restored file.
+    """
+    if path is None:
+        snapshots = list_snapshots(backup_dir)
+        if not snapshots:
+            raise FileNotFoundError(f"no snapshots in {backup_dir}")
+        path = snapshots[0]
+
+    ok, message = verify_snapshot(path)
+    if not ok:
+        raise RuntimeError(f"{path} failed integrity check: {message}")
+
+    # Build the restored copy beside db_path so the final swap is a rename.
+    # Writing into db_path itself fails when its header is corrupt.
+    staged = f"{db_path}.restore"
+    Path(staged).unlink(missing_ok=True)
+    try:
+        src = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            dst = sqlite3.connect(staged)
+            try:
+                src.backup(dst)
+            finally:
+                dst.close()
+        finally:
+            src.close()
+    except BaseException:
+        Path(staged).unlink(missing_ok=True)
+        raise
+
+    kept = None
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    if os.path.exists(db_path):
+        current_ok, _ = verify_snapshot(db_path)
+        if current_ok:
+            # Keep writes made since the snapshot; the backup API gives a
+            # consistent copy even if the API or bot is still writing.
+            kept = f"{db_path}.pre-restore-{stamp}"
+            src = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+            try:
+                dst = sqlite3.connect(kept)
+                try:
+                    src.backup(dst)
+                finally:
+                    dst.close()
+            finally:
+                src.close()
+            # Drop journal files so a hot journal is not replayed onto the restored file
+            for ext in ('-journal', '-wal', '-shm'):
+                Path(db_path + ext).unlink(missing_ok=True)
+        else:
+            kept = _move_aside(db_path, f"corrupt-{stamp}")
+
+    os.replace(staged, db_path)
+    return str(path), kept
+
+def start_scheduler(interval, db_path=DB_PATH, backup_dir=BACKUP_DIR, keep=BACKUP_KEEP):
+    """Take a snapshot every `interval` seconds on a daemon thread"""
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                create_snapshot(db_path, backup_dir, keep)
+            except Exception as e:
+                print(f"Scheduled backup failed: {e}")
+
+    thread = threading.Thread(target=run, name='backup-scheduler', daemon=True)
+    thread.start()
+    return thread
+
+def format_snapshot(info):
+    age = info['age_seconds']
+    if age < 120:
+        age_str = f"{age:.0f}s"
+    elif age < 7200:
+        age_str = f"{age / 60:.0f}m"
+    else:
+        age_str = f"{age / 3600:.1f}h"
+    return f"{info['path']} ({info['size']} bytes, {age_str} old)"
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'snapshot'
+    arg = sys.argv[2] if len(sys.argv) > 2 else None
+
+    try:
+        if command == 'snapshot':
+            print(f"[OK] Snapshot written: {format_snapshot(create_snapshot())}")
+        elif command == 'list':
+            snapshots = list_snapshots()
+            if not snapshots:
+                print(f"No snapshots in {BACKUP_DIR}")
+            for path in snapshots:
+                try:
+                    print(f"  {path} ({path.stat().st_size} bytes)")
+                except FileNotFoundError:
+                    continue
+        elif command == 'verify':
+            targets = [Path(arg)] if arg else list_snapshots()
+            all_ok = True
+            for path in targets:
+                ok, message = verify_snapshot(path)
+                print(f"  [{'OK' if ok else 'FAIL'}] {path}: {message}")
+                all_ok = all_ok and ok
+            sys.exit(0 if all_ok else 1)
+        elif command == 'restore':
+            restored, kept = restore_snapshot(arg)
+            print(f"[OK] Restored {DB_PATH} from {restored}")
+            if kept:
+                print(f"  Previous database kept as {kept}")
+            print("  Restart api.py and telegram_bot.py to pick up the restored file")
+        else:
+            print(__doc__)
+            sys.exit(2)
+    except Exception as e:
+        print(f"[FAIL] {command}: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
 Diagnostic script to check SF Dashboard system status
+Pass --backup to also take a snapshot of events.db
 """
 
 import os
@@ -14,6 +15,8 @@ from datetime import datetime
 import urllib.request
 import urllib.error
 
+import backup
+
 def check_port(port):
     """Check if a port is in use"""
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -74,6 +77,30 @@ def check_database():
         print(f"  [FAIL] Database error: {e}")
         return False
 
+def check_backups():
+    """Report the newest events.db snapshot"""
+    print("\n[BACKUP] Snapshot Status:")
+    info = backup.last_snapshot()
+    if info is None:
+        print(f"  [WARN] No snapshots in {backup.BACKUP_DIR}/ - run: python backup.py snapshot")
+        return None
+
+    print(f"  [OK] Last snapshot: {backup.format_snapshot(info)}")
+    if info['age_seconds'] > 24 * 3600:
+        print("  [WARN] Last snapshot is more than a day old")
+    return info
+
+def take_snapshot():
+    """Take a snapshot of events.db"""
+    print("\n[BACKUP] Taking Snapshot:")
+    try:
+        info = backup.create_snapshot()
+        print(f"  [OK] Snapshot written: {backup.format_snapshot(info)}")
+        return info
+    except Exception as e:
+        print(f"  [FAIL] Snapshot failed: {e}")
+        return None
+
 def check_processes():
     """Check running Python processes"""
     print("\n[PROC] Running Processes:")
@@ -110,6 +137,7 @@ def check_files():
     print("\n[FILES] Required Files:")
     required_files = [
         "api.py",
+        "backup.py",
         "telegram_bot.py", 
         "dashboard.html",
         "requirements.txt"
@@ -152,7 +180,7 @@ def test_add_event():
         print(f"  [FAIL] Could not test API: {e}")
         return False
 
-def suggest_fixes(api_ok, db_ok, api_running, bot_running, files_ok):
+def suggest_fixes(api_ok, db_ok, api_running, bot_running, files_ok, last_backup=None):
     """Suggest fixes based on diagnostic results"""
     print("\n[ACTION] Suggested Actions:")
     
@@ -160,7 +188,15 @@ def suggest_fixes(api_ok, db_ok, api_running, bot_running, files_ok):
         print("  1. Make sure all required files are in the current directory")
         return
     
-    if not api_running and not bot_running:
+    # A broken database also makes the API fail, so fix it first
+    if not db_ok:
+        print("  1. Database issues detected. Try:")
+        if last_backup:
+            print(f"     - Restore the last snapshot: python backup.py restore {last_backup['path']}")
+        else:
+            print("     - Remove database: del events.db (Windows) or rm events.db (Unix)")
+        print("     - Restart services")
+    elif not api_running and not bot_running:
         print("  1. Start both services:")
         print("     - python api.py")
         print("     - python telegram_bot.py")
@@ -171,10 +207,6 @@ def suggest_fixes(api_ok, db_ok, api_running, bot_running, files_ok):
     elif not api_ok:
         print("  1. API is running but not responding. Try:")
         print("     - Stop and restart it: Ctrl+C then 'python api.py'")
-    elif not db_ok:
-        print("  1. Database issues detected. Try:")
-        print("     - Remove database: del events.db (Windows) or rm events.db (Unix)")
-        print("     - Restart services")
     else:
         print("  [OK] Everything appears to be working!")
         print("  - Open: " + os.path.join(os.getcwd(), "dashboard.html"))
@@ -189,6 +221,13 @@ def main():
     files_ok = check_files()
     api_ok = check_api()
     db_ok = check_database()
+    if "--backup" in sys.argv:
+        if db_ok:
+            take_snapshot()
+        else:
+            print("\n[BACKUP] Taking Snapshot:")
+            print("  [WARN] Snapshot skipped: database check failed")
+    last_backup = check_backups()
     api_running, bot_running = check_processes()
     
     # Test functionality if API is running
@@ -196,7 +235,7 @@ def main():
         test_add_event()
     
     # Provide suggestions
-    suggest_fixes(api_ok, db_ok, api_running, bot_running, files_ok)
+    suggest_fixes(api_ok, db_ok, api_running, bot_running, files_ok, last_backup)
     
     print("\n===================================")
 
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Local load generator for the SF Dashboard API
+Hammers an endpoint from several threads and reports status codes,
+latency and the API's rate limit / coalescing metrics
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.request
+import urllib.error
+from collections import Counter
+
+def worker(url, method, count, results, latencies, lock):
+    """Send `count` requests and record their status codes"""
+    for _ in range(count):
+        data = None
+        headers = {}
+        if method == 'POST':
+            data = json.dumps({"title": "Load Test Event"}).encode('utf-8')
+            headers = {'Content-Type': 'application/json'}
+        req = urllib.request.Request(url, data=data, headers=headers, method=method)
+        start = time.perf_counter()
+        try:
+            response = urllib.request.urlopen(req, timeout=5)
+            response.read()
+            status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except Exception as e:
+            status = type(e).__name__
+        elapsed = time.perf_counter() - start
+        with lock:
+            results[status] += 1
+            latencies.append(elapsed)
+
+def fetch_metrics(base_url):
+    try:
+        response = urllib.request.urlopen(base_url + '/metrics', timeout=2)
+        return json.loads(response.read())
+    except Exception as e:
+        print(f"  [WARN] Could not fetch metrics: {e}")
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the SF Dashboard API")
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--path', default='/events')
+    parser.add_argument('--method', default='GET', choices=['GET', 'POST'])
+    parser.add_argument('--threads', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=50, help="requests per thread")
+    args = parser.parse_args()
+
+    url = args.base_url + args.path
+    results = Counter()
+    latencies = []
+    lock = threading.Lock()
+
+    print("===================================")
+    print(f"Load test: {args.method} {url}")
+    print(f"{args.threads} threads x {args.requests} requests")
+    print("===================================")
+
+    threads = [
+        threading.Thread(target=worker, args=(url, args.method, args.requests, results, latencies, lock))
+        for _ in range(args.threads)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    total = sum(results.values())
+    print(f"\n[RESULT] {total} requests in {elapsed:.2f}s ({total / elapsed:.1f} req/s)")
+    for status, n in sorted(results.items(), key=lambda item: str(item[0])):
+        print(f"  {status}: {n}")
+    if latencies:
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"  latency p50={p50 * 1000:.1f}ms p99={p99 * 1000:.1f}ms")
+
+    metrics = fetch_metrics(args.base_url)
+    if metrics:
+        print("\n[METRICS]")
+        print(f"  rate limited: {metrics.get('rate_limited_total')}")
+        print(f"  /events queries: {metrics.get('events_queries_total')}")
+        print(f"  /events coalesced: {metrics.get('events_coalesced_total')}")
+
+if __name__ == "__main__":
+    main()